@@ -1,22 +1,75 @@
 import asyncio
-from typing import Optional
+import hashlib
+import io
+import json
+import os
+import sys
+from typing import AsyncIterator, Optional
 from contextlib import AsyncExitStack
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
 from dotenv import load_dotenv
-import boto3
-from botocore.exceptions import ClientError
 
-load_dotenv()  # load environment variables from .env
+load_dotenv(override=False)  # load environment variables from .env (no-op if already set)
 
 class MCPClient:
     def __init__(self):
         # Initialize session and client objects
         self.session: Optional[ClientSession] = None
-        self.exit_stack = AsyncExitStack()
-        self.bedrock = boto3.client("bedrock-runtime", region_name="us-west-2")
+        # Scoped to one server connection; replaced on disconnect so a
+        # reconnect can't leak the previous transport or child interpreter
+        self._server_stack = AsyncExitStack()
+        # Import boto3 here rather than at module top: loading the botocore
+        # service models costs hundreds of ms that importers who never touch
+        # Bedrock shouldn't pay
+        import boto3
+        from botocore.config import Config
+        from botocore.exceptions import ClientError
+        self._ClientError = ClientError
+
+        # Reuse one Session (credential resolution happens once) and widen the
+        # HTTP connection pool beyond the default of 10 so concurrent converse
+        # calls don't queue; keep-alive avoids TCP handshakes in the tool loop
+        self._session = boto3.session.Session()
+        self.bedrock = self._session.client(
+            "bedrock-runtime",
+            config=Config(
+                region_name="us-west-2",
+                max_pool_connections=50,
+                retries={"max_attempts": 3, "mode": "adaptive"},
+                tcp_keepalive=True,
+            ),
+        )
+        self._tools = []
+        self._available_tools = []
+        self._tool_config = None
+        self._server_script_path: Optional[str] = None
+        # LRU by insertion order: hits are re-inserted, the oldest entry is
+        # evicted once the cache is full
+        self._response_cache: dict[str, str] = {}
+        self._response_cache_max = 128
+        # History window for the tool loop: keep the last _max_history_turns
+        # messages, but only trim once _cache_buffer extra turns accumulate
+        # and always cut at multiples of _cache_buffer so the retained prefix
+        # stays stable (and cacheable) for several calls between trims
+        self._max_history_turns = 20
+        self._cache_buffer = 4
+
+        # The child environment is the same for every connect, so build it
+        # once: the virtual environment's site-packages on PYTHONPATH plus
+        # UTF-8 stdio encoding
+        venv_site_packages = os.path.join(os.path.dirname(sys.executable), '..', 'lib', 'python{}.{}'.format(
+            sys.version_info.major, sys.version_info.minor), 'site-packages')
+        self._base_env = dict(os.environ)
+        if 'PYTHONPATH' in self._base_env:
+            self._base_env['PYTHONPATH'] = f"{venv_site_packages}{os.pathsep}{self._base_env['PYTHONPATH']}"
+        else:
+            self._base_env['PYTHONPATH'] = venv_site_packages
+        self._base_env['PYTHONIOENCODING'] = 'utf-8'
+        if os.name == 'nt':  # Windows
+            self._base_env['PYTHONLEGACYWINDOWSSTDIO'] = '0'
 
     async def connect_to_server(self, server_script_path: str):
         """Connect to an MCP server
@@ -28,57 +81,90 @@ class MCPClient:
         is_js = server_script_path.endswith('.js')
         if not (is_python or is_js):
             raise ValueError("Server script must be a .py or .js file")
-            
-        # Use the Python interpreter from the local virtual environment
-        import sys
-        import os
-        
+
+        # Reconnecting to the same script reuses the live worker: interpreter
+        # startup dominates connect cost, so keep the spawned server
+        # persistent for the session instead of forking a fresh one per call
+        if self.session is not None and server_script_path == self._server_script_path:
+            return
+
         if is_python:
-            # Get the path to the current Python interpreter in the virtual environment
-            python_path = sys.executable
-            command = python_path
+            # Use the Python interpreter from the local virtual environment
+            command = sys.executable
         else:
             command = "node"
-        
-        # Get the current environment variables
-        env = dict(os.environ)
-        
-        # Add the virtual environment's Python path to PYTHONPATH
-        venv_site_packages = os.path.join(os.path.dirname(python_path), '..', 'lib', 'python{}.{}'.format(
-            sys.version_info.major, sys.version_info.minor), 'site-packages')
-        
-        if 'PYTHONPATH' in env:
-            env['PYTHONPATH'] = f"{venv_site_packages}{os.pathsep}{env['PYTHONPATH']}"
-        else:
-            env['PYTHONPATH'] = venv_site_packages
-        
-        # Force UTF-8 encoding for stdin/stdout
-        env['PYTHONIOENCODING'] = 'utf-8'
-        
-        # Set additional environment variables to ensure proper encoding
-        if os.name == 'nt':  # Windows
-            env['PYTHONLEGACYWINDOWSSTDIO'] = '0'
-            os.environ['PYTHONIOENCODING'] = 'utf-8'
-        
+
+        # The precomputed env is never mutated downstream, so no copy needed
         server_params = StdioServerParameters(
             command=command,
             args=[server_script_path],
-            env=env
+            env=self._base_env
         )
-        
-        stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
+
+        # Eagerly close any previous connection so reconnects don't pile up
+        # open pipes and zombie server processes
+        await self.disconnect()
+
+        stdio_transport = await self._server_stack.enter_async_context(stdio_client(server_params))
         self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write))
+        self.session = await self._server_stack.enter_async_context(ClientSession(self.stdio, self.write))
         
         await self.session.initialize()
-        
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
-        print("\nConnected to server with tools:", [tool.name for tool in tools])
 
-    async def process_query(self, query: str) -> str:
-        """Process a query using Claude and available tools"""
+        # List available tools once; they are static for the server session,
+        # so cache them along with the pre-built Bedrock toolSpec array
+        # instead of re-fetching on every query. The request goes out as a
+        # task the moment initialize completes (MCP requires the handshake to
+        # finish first), and the toolSpec transform is set up while the RPC
+        # is in flight.
+        tools_task = asyncio.create_task(self.session.list_tools())
+
+        def to_tool_spec(tool):
+            return {
+                "toolSpec": {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "inputSchema": {
+                        "json": tool.inputSchema
+                    }
+                }
+            }
+
+        response = await tools_task
+        self._tools = response.tools
+        self._available_tools = [to_tool_spec(tool) for tool in self._tools]
+        # The tool config (schema + trailing cachePoint) is immutable for the
+        # session; build it once instead of per converse call
+        self._tool_config = {"tools": self._available_tools + [{"cachePoint": {"type": "default"}}]}
+        self._server_script_path = server_script_path
+        print("\nConnected to server with tools:", [tool.name for tool in self._tools])
+
+    def _trim_history(self, messages: list) -> list:
+        """Drop the oldest tool cycles once history exceeds the window.
+
+        Without a bound, a multi-hop tool loop re-tokenizes an ever-growing
+        history on every Bedrock call. The original user query at index 0 is
+        always kept (cutting it can never leave a valid Converse history);
+        whole assistant/toolResult cycles after it are dropped instead.
+        Truncation happens at multiples of _cache_buffer, so the surviving
+        suffix is byte-identical across several consecutive calls and the
+        prefix cache stays warm between trims.
+        """
+        if len(messages) <= self._max_history_turns + self._cache_buffer:
+            return messages
+
+        drop = ((len(messages) - self._max_history_turns) // self._cache_buffer) * self._cache_buffer
+        # The message after the cut must be an assistant turn: then the
+        # history still alternates user/assistant from index 0 and every
+        # surviving toolResult keeps the toolUse turn it answers
+        while 1 + drop < len(messages) and messages[1 + drop]["role"] != "assistant":
+            drop += 1
+        if 1 + drop >= len(messages):
+            return messages
+        return [messages[0]] + messages[1 + drop:]
+
+    async def process_query(self, query: str) -> AsyncIterator[str]:
+        """Process a query using Claude and available tools, yielding text as it streams"""
         messages = [
             {
                 "role": "user",
@@ -86,104 +172,171 @@ class MCPClient:
             }
         ]
 
-        response = await self.session.list_tools()
-        available_tools = [{
-            "toolSpec": {
-                "name": tool.name,
-                "description": tool.description,
-                "inputSchema": {
-                    "json": tool.inputSchema
-                }
-            }
-        } for tool in response.tools]
+        available_tools = self._available_tools
 
-        system_prompt = [{"text": "You are a helpful AI assistant."}]
+        # Mark the static prefix (system prompt + tool schema) with cachePoint
+        # blocks so Bedrock reuses the cached prefix across the follow-up
+        # converse calls in the tool loop and across queries. The blocks must
+        # stay in the same positions for the cache to hit.
+        system_prompt = [
+            {"text": "You are a helpful AI assistant."},
+            {"cachePoint": {"type": "default"}},
+        ]
         inference_config = {
             "temperature": 0,
             "maxTokens": 2048,
             "topP": 0,
         }
 
-        # Initial Bedrock API call
-        try:
-            response = self.bedrock.converse(
-                modelId="anthropic.claude-3-5-sonnet-20241022-v2:0",
-                messages=messages,
-                system=system_prompt,
-                toolConfig={"tools": available_tools},
-                inferenceConfig=inference_config,
+        # Interactive sessions often repeat queries (debugging, re-runs).
+        # Serve pure-text responses from a local cache and skip Bedrock
+        # entirely; only responses that involved no tool use are cached, since
+        # tool results can go stale.
+        cache_key = hashlib.blake2b(json.dumps(
+            [
+                query,
+                system_prompt,
+                sorted(tool["toolSpec"]["name"] for tool in available_tools),
+                "anthropic.claude-3-5-sonnet-20241022-v2:0",
+                inference_config,
+            ],
+            sort_keys=True,
+        ).encode()).hexdigest()
+        cached = self._response_cache.pop(cache_key, None)
+        if cached is not None:
+            self._response_cache[cache_key] = cached  # re-insert as most recent
+            yield cached
+            return
+
+        used_tools = False
+
+        while True:
+            # Stream the response so text reaches the user as it is generated
+            # instead of after the full completion finishes. botocore is
+            # synchronous, so run it in a worker thread to keep the event loop
+            # (and the MCP stdio reader) responsive.
+            # Reassemble the assistant message from the stream, yielding text
+            # deltas as they arrive and buffering toolUse input JSON fragments
+            # until the block completes. The try covers the stream reads too:
+            # throttling and connection errors can surface mid-stream, not
+            # just on the initial call.
+            content_list = []
+            text_buf = None
+            tool_use = None
+            tool_input_buf = None
+
+            try:
+                response = await asyncio.to_thread(
+                    self.bedrock.converse_stream,
+                    modelId="anthropic.claude-3-5-sonnet-20241022-v2:0",
+                    messages=messages,
+                    system=system_prompt,
+                    toolConfig=self._tool_config,
+                    inferenceConfig=inference_config,
+                )
+
+                # Pull stream events in the worker thread too: each next()
+                # blocks on a socket read for the duration of a token
+                stream = iter(response["stream"])
+                while (event := await asyncio.to_thread(next, stream, None)) is not None:
+                    if "contentBlockStart" in event:
+                        # These keys are always present in their events; index
+                        # directly rather than allocating fallback dicts
+                        start = event["contentBlockStart"]["start"]
+                        if "toolUse" in start:
+                            tool_use = {
+                                "toolUseId": start["toolUse"]["toolUseId"],
+                                "name": start["toolUse"]["name"],
+                            }
+                            tool_input_buf = io.StringIO()
+                    elif "contentBlockDelta" in event:
+                        delta = event["contentBlockDelta"]["delta"]
+                        # Long completions arrive as hundreds of token-sized
+                        # deltas; a StringIO buffer avoids re-scanning a
+                        # growing list at join time
+                        if "text" in delta:
+                            if text_buf is None:
+                                text_buf = io.StringIO()
+                            text_buf.write(delta["text"])
+                            yield delta["text"]
+                        elif "toolUse" in delta:
+                            tool_input_buf.write(delta["toolUse"]["input"])
+                    elif "contentBlockStop" in event:
+                        if tool_use is not None:
+                            input_json = tool_input_buf.getvalue()
+                            tool_use["input"] = json.loads(input_json) if input_json else {}
+                            content_list.append({"toolUse": tool_use})
+                            tool_use = None
+                            tool_input_buf = None
+                        elif text_buf is not None:
+                            content_list.append({"text": text_buf.getvalue()})
+                            text_buf = None
+            except self._ClientError as e:
+                print(f"Bedrock API error: {str(e)}")
+                yield "Error calling Bedrock API"
+                return
+
+            # Add the assistant's response to the message history. The trailing
+            # cachePoint lets the follow-up call that carries the toolResult
+            # reuse the conversation prefix up to this turn. Bedrock allows at
+            # most four checkpoints per request and the system prompt and tool
+            # config already hold two, so roll a single message checkpoint
+            # forward: strip the one on the previous turn before marking this
+            # one.
+            for message in messages:
+                if message["content"] and "cachePoint" in message["content"][-1]:
+                    message["content"] = message["content"][:-1]
+            messages.append({
+                "role": "assistant",
+                "content": content_list + [{"cachePoint": {"type": "default"}}]
+            })
+            messages = self._trim_history(messages)
+
+            tool_uses = [content["toolUse"] for content in content_list if "toolUse" in content]
+            if not tool_uses:
+                if not used_tools:
+                    if len(self._response_cache) >= self._response_cache_max:
+                        self._response_cache.pop(next(iter(self._response_cache)))
+                    self._response_cache[cache_key] = "".join(
+                        content["text"] for content in content_list if "text" in content
+                    )
+                return
+            used_tools = True
+
+            # Execute independent tool calls concurrently and send all results
+            # back in a single message, so N tools cost one round trip instead
+            # of N sequential ones
+            for tool_use in tool_uses:
+                tool_args = json.dumps(tool_use["input"], sort_keys=True, separators=(",", ":"), default=str)
+                yield f"\n[Calling tool {tool_use['name']} with args {tool_args}]\n"
+
+            results = await asyncio.gather(
+                *(self.session.call_tool(tool_use["name"], tool_use["input"]) for tool_use in tool_uses)
             )
-        except ClientError as e:
-            print(f"Bedrock API error: {str(e)}")
-            return "Error calling Bedrock API"
-
-        # After getting the initial response, add it to messages
-        output_message = response.get("output", {}).get("message", {})
-        messages.append({
-            "role": "assistant",
-            "content": output_message.get("content", [])
-        })
-
-        # Process response and handle tool calls
-        tool_results = []
-        final_text = []
-
-        output_message = response.get("output", {}).get("message", {})
-        content_list = output_message.get("content", [])
-
-        for content in content_list:
-            if "text" in content:
-                final_text.append(content["text"])
-            elif "toolUse" in content:
-                tool_use = content["toolUse"]
-                tool_name = tool_use["name"]
-                tool_args = tool_use["input"]
-                
-                # Execute tool call
-                result = await self.session.call_tool(tool_name, tool_args)
-                tool_results.append({"call": tool_name, "result": result})
-                final_text.append(f"[Calling tool {tool_name} with args {tool_args}]")
 
-                # Add this before creating the tool_result
+            tool_result_content = []
+            for tool_use, result in zip(tool_uses, results):
+                # Serialize non-string payloads canonically (sorted keys,
+                # fixed separators): str() dict reprs are not deterministic,
+                # and a byte-for-byte stable history is what lets Bedrock's
+                # prefix cache hit on retries and replays
                 if hasattr(result, 'content'):
-                    result_content = result.content if isinstance(result.content, str) else str(result.content)
+                    result_content = result.content if isinstance(result.content, str) else json.dumps(
+                        result.content, sort_keys=True, separators=(",", ":"), default=str)
                 else:
-                    result_content = str(result)
+                    result_content = json.dumps(result, sort_keys=True, separators=(",", ":"), default=str)
 
-                tool_result = {
-                    "toolUseId": tool_use["toolUseId"],
-                    "content": [{"text": result_content}]
-                }
-                
-                messages.append({
-                    "role": "user",
-                    "content": [{"toolResult": tool_result}]
+                tool_result_content.append({
+                    "toolResult": {
+                        "toolUseId": tool_use["toolUseId"],
+                        "content": [{"text": result_content}]
+                    }
                 })
 
-                # Get next response from Bedrock
-                try:
-                    response = self.bedrock.converse(
-                        modelId="anthropic.claude-3-5-sonnet-20241022-v2:0",
-                        messages=messages,
-                        system=system_prompt,
-                        toolConfig={"tools": available_tools},
-                        inferenceConfig=inference_config,
-                    )
-                    output_message = response.get("output", {}).get("message", {})
-                    # Add the assistant's response to the message history
-                    messages.append({
-                        "role": "assistant",
-                        "content": output_message.get("content", [])
-                    })
-                    if "content" in output_message:
-                        for content in output_message["content"]:
-                            if "text" in content:
-                                final_text.append(content["text"])
-                except ClientError as e:
-                    print(f"Bedrock API error: {str(e)}")
-                    return "Error calling Bedrock API"
-
-        return "\n".join(final_text)
+            messages.append({
+                "role": "user",
+                "content": tool_result_content
+            })
 
     async def chat_loop(self):
         """Run an interactive chat loop"""
@@ -192,20 +345,35 @@ class MCPClient:
         
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                # Read input in a worker thread so the event loop (and the MCP
+                # stdio reader draining server notifications) stays live while
+                # waiting for the user
+                query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
                 
                 if query.lower() == 'quit':
                     break
-                    
-                response = await self.process_query(query)
-                print("\n" + response)
-                    
+
+                print()
+                async for chunk in self.process_query(query):
+                    print(chunk, end="", flush=True)
+                print()
+
             except Exception as e:
                 print(f"\nError: {str(e)}")
     
+    async def disconnect(self):
+        """Close the current server connection, if any (idempotent)"""
+        await self._server_stack.aclose()
+        self._server_stack = AsyncExitStack()
+        self.session = None
+        self._tools = []
+        self._available_tools = []
+        self._tool_config = None
+        self._server_script_path = None
+
     async def cleanup(self):
         """Clean up resources"""
-        await self.exit_stack.aclose()
+        await self.disconnect()
 
 async def main():
     if len(sys.argv) < 2:
@@ -220,5 +388,4 @@ async def main():
         await client.cleanup()
 
 if __name__ == "__main__":
-    import sys
     asyncio.run(main())
@@ -1,4 +1,6 @@
 import asyncio
+import os
+import sys
 from typing import Optional
 from contextlib import AsyncExitStack
 
@@ -14,8 +16,25 @@ class MCPClient:
     def __init__(self):
         # Initialize session and client objects
         self.session: Optional[ClientSession] = None
-        self.exit_stack = AsyncExitStack()
+        # Scoped to one server connection; replaced on disconnect so a
+        # reconnect can't leak the previous transport or child interpreter
+        self._server_stack = AsyncExitStack()
         self.anthropic = Anthropic()
+        self._server_script_path: Optional[str] = None
+
+        # The child environment is the same for every connect, so build it
+        # once: the virtual environment's site-packages on PYTHONPATH plus
+        # UTF-8 stdio encoding
+        venv_site_packages = os.path.join(os.path.dirname(sys.executable), '..', 'lib', 'python{}.{}'.format(
+            sys.version_info.major, sys.version_info.minor), 'site-packages')
+        self._base_env = dict(os.environ)
+        if 'PYTHONPATH' in self._base_env:
+            self._base_env['PYTHONPATH'] = f"{venv_site_packages}{os.pathsep}{self._base_env['PYTHONPATH']}"
+        else:
+            self._base_env['PYTHONPATH'] = venv_site_packages
+        self._base_env['PYTHONIOENCODING'] = 'utf-8'
+        if os.name == 'nt':  # Windows
+            self._base_env['PYTHONLEGACYWINDOWSSTDIO'] = '0'
 
     async def connect_to_server(self, server_script_path: str):
         """Connect to an MCP server
@@ -27,50 +46,37 @@ class MCPClient:
         is_js = server_script_path.endswith('.js')
         if not (is_python or is_js):
             raise ValueError("Server script must be a .py or .js file")
-            
-        # Use the Python interpreter from the local virtual environment
-        import sys
-        import os
-        
+
+        # Reconnecting to the same script reuses the live worker: interpreter
+        # startup dominates connect cost, so keep the spawned server
+        # persistent for the session instead of forking a fresh one per call
+        if self.session is not None and server_script_path == self._server_script_path:
+            return
+
         if is_python:
-            # Get the path to the current Python interpreter in the virtual environment
-            python_path = sys.executable
-            command = python_path
+            # Use the Python interpreter from the local virtual environment
+            command = sys.executable
         else:
             command = "node"
-        
-        # Get the current environment variables
-        env = dict(os.environ)
-        
-        # Add the virtual environment's Python path to PYTHONPATH
-        venv_site_packages = os.path.join(os.path.dirname(python_path), '..', 'lib', 'python{}.{}'.format(
-            sys.version_info.major, sys.version_info.minor), 'site-packages')
-        
-        if 'PYTHONPATH' in env:
-            env['PYTHONPATH'] = f"{venv_site_packages}{os.pathsep}{env['PYTHONPATH']}"
-        else:
-            env['PYTHONPATH'] = venv_site_packages
-        
-        # Force UTF-8 encoding for stdin/stdout
-        env['PYTHONIOENCODING'] = 'utf-8'
-        
-        # Set additional environment variables to ensure proper encoding
-        if os.name == 'nt':  # Windows
-            env['PYTHONLEGACYWINDOWSSTDIO'] = '0'
-            os.environ['PYTHONIOENCODING'] = 'utf-8'
-        
+
+        # The precomputed env is never mutated downstream, so no copy needed
         server_params = StdioServerParameters(
             command=command,
             args=[server_script_path],
-            env=env
+            env=self._base_env
         )
-        
-        stdio_transport = await self.exit_stack.enter_async_context(stdio_client(server_params))
+
+        # Eagerly close any previous connection so reconnects don't pile up
+        # open pipes and zombie server processes
+        await self.disconnect()
+
+        stdio_transport = await self._server_stack.enter_async_context(stdio_client(server_params))
         self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(ClientSession(self.stdio, self.write))
+        self.session = await self._server_stack.enter_async_context(ClientSession(self.stdio, self.write))
         
         await self.session.initialize()
-        
+        self._server_script_path = server_script_path
+
         # List available tools
         response = await self.session.list_tools()
         tools = response.tools
@@ -145,7 +151,10 @@ class MCPClient:
         
         while True:
             try:
-                query = input("\nQuery: ").strip()
+                # Read input in a worker thread so the event loop (and the MCP
+                # stdio reader draining server notifications) stays live while
+                # waiting for the user
+                query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
                 
                 if query.lower() == 'quit':
                     break
@@ -156,9 +165,16 @@ class MCPClient:
             except Exception as e:
                 print(f"\nError: {str(e)}")
     
+    async def disconnect(self):
+        """Close the current server connection, if any (idempotent)"""
+        await self._server_stack.aclose()
+        self._server_stack = AsyncExitStack()
+        self.session = None
+        self._server_script_path = None
+
     async def cleanup(self):
         """Clean up resources"""
-        await self.exit_stack.aclose()
+        await self.disconnect()
 
 async def main():
     if len(sys.argv) < 2:
@@ -173,5 +189,4 @@ async def main():
         await client.cleanup()
 
 if __name__ == "__main__":
-    import sys
     asyncio.run(main())
@@ -0,0 +1,64 @@
+"""Simulation check for MCPClient._trim_history.
+
+The window once regressed to a silent no-op (the cut-point guard could
+never match, so histories grew unbounded); this drives synthetic tool
+cycles through the trimmer and asserts the bound actually holds and the
+result is still a valid Converse history. Run with pytest or directly.
+"""
+from bedrockClient import MCPClient
+
+
+def make_client():
+    # __new__ skips __init__ so the check needs no AWS credentials or boto3
+    # session; only the window parameters matter here
+    client = MCPClient.__new__(MCPClient)
+    client._max_history_turns = 20
+    client._cache_buffer = 4
+    return client
+
+
+def simulate(client, cycles):
+    """Grow a history the way process_query's tool loop does, trimming after
+    each assistant turn, and return it with whether a trim ever fired."""
+    messages = [{"role": "user", "content": [{"text": "query"}]}]
+    trimmed = False
+    for i in range(cycles):
+        messages.append({"role": "assistant", "content": [{"toolUse": {"toolUseId": str(i)}}]})
+        new = client._trim_history(messages)
+        trimmed = trimmed or len(new) < len(messages)
+        messages = new
+        messages.append({"role": "user", "content": [{"toolResult": {"toolUseId": str(i)}}]})
+    return messages, trimmed
+
+
+def assert_valid_converse_history(messages):
+    # Opens with the plain user query, alternates roles, and every surviving
+    # toolResult still follows the assistant toolUse turn it answers
+    assert messages[0]["role"] == "user"
+    assert "toolResult" not in messages[0]["content"][0]
+    for i, message in enumerate(messages):
+        assert message["role"] == ("user" if i % 2 == 0 else "assistant")
+        if i > 0 and message["role"] == "user":
+            assert "toolUse" in messages[i - 1]["content"][0]
+
+
+def test_trim_history_keeps_short_histories():
+    client = make_client()
+    messages, trimmed = simulate(client, 5)
+    assert not trimmed
+    assert len(messages) == 11
+
+
+def test_trim_history_bounds_growth():
+    for cycles in (15, 20, 50, 200):
+        client = make_client()
+        messages, trimmed = simulate(client, cycles)
+        assert trimmed, f"window never fired at {cycles} tool cycles"
+        assert len(messages) <= client._max_history_turns + client._cache_buffer + 2
+        assert_valid_converse_history(messages)
+
+
+if __name__ == "__main__":
+    test_trim_history_keeps_short_histories()
+    test_trim_history_bounds_growth()
+    print("ok")
@@ -1,4 +1,5 @@
 import logging
+import os
 from typing import Any
 from mcp.server.models import InitializationOptions
 import mcp.types as types
@@ -184,7 +185,30 @@ async def handle_call_tool(
             )]
     else:
         raise ValueError(f"Unknown tool: {name}")
+def widen_stdio_pipes(size: int = 1 << 20) -> None:
+    """Best-effort: enlarge the stdio pipe buffers (Linux only).
+
+    Tool results travel to the client through these pipes, and the kernel
+    default of 64KB forces a syscall roughly every 64KB of payload. Either
+    end of a pipe may resize it, so do it here where the fds are our own
+    stdin/stdout; silently skip where unsupported.
+    """
+    if os.name != "posix":
+        return
+    try:
+        import fcntl
+    except ImportError:
+        return
+    op = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+    for fd in (0, 1):
+        try:
+            fcntl.fcntl(fd, op, size)
+        except OSError:
+            pass
+
 async def main():
+    widen_stdio_pipes()
+
     # Run the server using stdin/stdout streams
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
         await server.run(